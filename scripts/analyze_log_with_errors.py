@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Analyze SAS runtime errors in log-with-errors.txt.
+"""Analyze SAS runtime errors in one or many SAS logs.
 
 This script implements the Pass 1 categorization plan:
 - Count canonical runtime errors/warnings (lines starting with ERROR:/WARNING:)
@@ -8,78 +8,64 @@ This script implements the Pass 1 categorization plan:
 - Attribute each runtime error to active include file and MLOGIC context
 - Classify each runtime error into agreed categories A-E
 - Validate category and total invariants
+
+Inputs may be files, globs, or directories (searched recursively for
+--pattern). Each file is parsed in one streaming pass into counters, so memory
+is bounded by the number of distinct signatures/contexts rather than by log
+size, and files are spread over a process pool (--jobs). Every file gets a JSON
+index under --index-dir holding its counters and the byte offset parsed so far;
+with --incremental the next run resumes from that offset and parses only the
+bytes appended since. The Markdown/JSON report merges all files.
+
+Logs are scanned as bytes but split and stripped like the text-mode reader
+they replace: \n, \r\n and a bare \r all end a line, and the whitespace
+allowed before ERROR:/WARNING: is what str.lstrip() removes, UTF-8 encoded
+(so a UTF-8 no-break space counts), plus a Latin-1 no-break space byte (0xA0),
+which the text-mode reader turned into U+FFFD and missed.
 """
 
 from __future__ import annotations
 
 import argparse
+import glob
+import hashlib
 import json
+import os
 import re
 from collections import Counter
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
 
 
 INCLUDE_RE = re.compile(r"^NOTE: %INCLUDE \(level 1\) file (?P<path>\S+) is file")
 MLOGIC_RE = re.compile(r"^MLOGIC\((?P<context>[^)]*)\):")
+# Leading whitespace str.lstrip() removes (minus the line breaks), as UTF-8 bytes, plus the Latin-1 NBSP byte.
+LEAD_WS = (
+    rb"(?:[ \t\x0b\x0c\x1c-\x1f\xa0]|\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]"
+    rb"|\xe2\x81\x9f|\xe3\x80\x80)*"
+)
+# Whole lines that can change the counters or the include/MLOGIC context; everything else is skipped.
+# Runs on blocks whose line breaks are normalized to \n. Group "line" starts at ERROR:/WARNING: once
+# the leading whitespace is skipped, and at column 0 for %INCLUDE banners and MLOGIC lines.
+SCAN_RE = re.compile(
+    rb"^(?:" + LEAD_WS + rb"(?=ERROR:|WARNING:)|(?=NOTE: %INCLUDE|MLOGIC\())(?P<line>[^\n]*)\n", re.M
+)
+BLOCK_BYTES = 8 << 20
 
 TARGET_PREDICATES = "/parm_share/small_business/modeling/sassyverse/src/pipr/predicates.sas"
 TARGET_PIPE = "/parm_share/small_business/modeling/sassyverse/src/pipr/pipr.sas"
 
-
-@dataclass(frozen=True)
-class RuntimeMessage:
-    line_no: int
-    include_file: str
-    mlogic_context: str
-    text: str
+INDEX_VERSION = 1
+# Bytes hashed to tell an appended log (same head) from a rewritten one.
+HEAD_BYTES = 4096
 
 
 def normalize_ws(text: str) -> str:
     return re.sub(r"\s+", " ", text.strip())
 
 
-def parse_runtime_messages(lines: Iterable[str]) -> Tuple[List[RuntimeMessage], List[RuntimeMessage]]:
-    include_file = ""
-    mlogic_context = ""
-    errors: List[RuntimeMessage] = []
-    warnings: List[RuntimeMessage] = []
-
-    for idx, raw in enumerate(lines, start=1):
-        line = raw.rstrip("\n")
-
-        include_match = INCLUDE_RE.match(line)
-        if include_match:
-            include_file = include_match.group("path")
-
-        mlogic_match = MLOGIC_RE.match(line)
-        if mlogic_match:
-            mlogic_context = mlogic_match.group("context")
-
-        stripped = line.lstrip()
-        if stripped.startswith("ERROR:"):
-            errors.append(
-                RuntimeMessage(
-                    line_no=idx,
-                    include_file=include_file,
-                    mlogic_context=mlogic_context,
-                    text=normalize_ws(stripped),
-                )
-            )
-        elif stripped.startswith("WARNING:"):
-            warnings.append(
-                RuntimeMessage(
-                    line_no=idx,
-                    include_file=include_file,
-                    mlogic_context=mlogic_context,
-                    text=normalize_ws(stripped),
-                )
-            )
-
-    return errors, warnings
-
-
 def classify_error(signature: str) -> str:
     if signature == "ERROR: Maximum level of nesting of macro functions exceeded.":
         return "D"
@@ -112,45 +98,275 @@ def classify_error(signature: str) -> str:
     return "UNCLASSIFIED"
 
 
-def first_occurrence(signatures: Iterable[RuntimeMessage]) -> Dict[str, int]:
-    first: Dict[str, int] = {}
-    for msg in signatures:
-        if msg.text not in first:
-            first[msg.text] = msg.line_no
-    return first
+@dataclass
+class LogAggregate:
+    """Counters for one or more logs. Size grows with distinct signatures and contexts, not with lines."""
+
+    total_lines: int = 0
+    error_count: int = 0
+    warning_count: int = 0
+    signature_counts: Counter = field(default_factory=Counter)
+    include_counts: Counter = field(default_factory=Counter)
+    category_counts: Counter = field(default_factory=Counter)
+    context_counts: Counter = field(default_factory=Counter)
+    warning_counts: Counter = field(default_factory=Counter)
+    # signature -> (log path, line number) of its first occurrence
+    first_occurrence: Dict[str, Tuple[str, int]] = field(default_factory=dict)
+
+    def add_error(self, log_path: str, line_no: int, include_file: str, mlogic_context: str, text: str) -> None:
+        self.error_count += 1
+        self.signature_counts[text] += 1
+        self.include_counts[include_file] += 1
+        self.category_counts[classify_error(text)] += 1
+        self.context_counts[(include_file, mlogic_context, text)] += 1
+        if text not in self.first_occurrence:
+            self.first_occurrence[text] = (log_path, line_no)
+
+    def add_warning(self, text: str) -> None:
+        self.warning_count += 1
+        self.warning_counts[text] += 1
+
+    def merge(self, other: "LogAggregate") -> None:
+        """Fold other in; first occurrences already held win, so merge in input order."""
+        self.total_lines += other.total_lines
+        self.error_count += other.error_count
+        self.warning_count += other.warning_count
+        self.signature_counts.update(other.signature_counts)
+        self.include_counts.update(other.include_counts)
+        self.category_counts.update(other.category_counts)
+        self.context_counts.update(other.context_counts)
+        self.warning_counts.update(other.warning_counts)
+        for text, where in other.first_occurrence.items():
+            self.first_occurrence.setdefault(text, where)
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "total_lines": self.total_lines,
+            "error_count": self.error_count,
+            "warning_count": self.warning_count,
+            "signature_counts": dict(self.signature_counts),
+            "include_counts": dict(self.include_counts),
+            "category_counts": dict(self.category_counts),
+            "context_counts": [[*key, count] for key, count in self.context_counts.items()],
+            "warning_counts": dict(self.warning_counts),
+            "first_occurrence": {text: list(where) for text, where in self.first_occurrence.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, object]) -> "LogAggregate":
+        agg = cls(
+            total_lines=int(data["total_lines"]),  # type: ignore[arg-type]
+            error_count=int(data["error_count"]),  # type: ignore[arg-type]
+            warning_count=int(data["warning_count"]),  # type: ignore[arg-type]
+        )
+        agg.signature_counts.update(data["signature_counts"])  # type: ignore[arg-type]
+        agg.include_counts.update(data["include_counts"])  # type: ignore[arg-type]
+        agg.category_counts.update(data["category_counts"])  # type: ignore[arg-type]
+        for include_file, context, text, count in data["context_counts"]:  # type: ignore[union-attr]
+            agg.context_counts[(include_file, context, text)] = count
+        agg.warning_counts.update(data["warning_counts"])  # type: ignore[arg-type]
+        for text, (log_path, line_no) in data["first_occurrence"].items():  # type: ignore[union-attr]
+            agg.first_occurrence[text] = (log_path, int(line_no))
+        return agg
+
+    def summary(self, single_log: bool = True) -> Dict[str, object]:
+        """Report summary; first occurrences are line numbers for one log, "path:line" across several."""
+        if single_log:
+            first: Dict[str, object] = {text: line for text, (_, line) in self.first_occurrence.items()}
+        else:
+            first = {text: f"{path}:{line}" for text, (path, line) in self.first_occurrence.items()}
+        return {
+            "signature_counts": dict(self.signature_counts),
+            "include_counts": dict(self.include_counts),
+            "category_counts": dict(self.category_counts),
+            "context_counts": {" | ".join(k): v for k, v in self.context_counts.items()},
+            "first_occurrence": first,
+        }
+
+
+@dataclass
+class ParseState:
+    """Where parsing of one log stopped: byte offset, line number, and the include/MLOGIC context then active."""
+
+    offset: int = 0
+    line_no: int = 0
+    include_file: str = ""
+    mlogic_context: str = ""
+
+
+def parse_stream(
+    stream: BinaryIO, agg: LogAggregate, state: ParseState, log_path: str, flush: bool = True
+) -> None:
+    """Parse complete lines from stream (positioned at state.offset) into agg, advancing state.
+
+    The stream is read in blocks and only lines that can matter are located by one regex per
+    block; line numbers come from counting newlines between matches. \r\n and a bare \r become
+    \n before the scan (offsets still count the original bytes), and a \r that ends a block stays
+    in the carry, since its \n may start the next one. A final line without a line break
+    is parsed when flush is set; with flush=False (--incremental) it is left unparsed, since the
+    log may still be being written and the next run picks it up whole.
+    """
+    carry = b""
+    while True:
+        block = stream.read(BLOCK_BYTES)
+        if block:
+            data = carry + block
+            search_to = len(data) - 1 if data.endswith(b"\r") else len(data)
+            end = max(data.rfind(b"\n", 0, search_to), data.rfind(b"\r", 0, search_to)) + 1
+            carry = data[end:]
+            if end == 0:
+                continue
+            consumed = end
+        elif flush and carry:
+            data = carry + b"\n"
+            end = len(data)
+            consumed = len(carry)
+            carry = b""
+        else:
+            break
+        if data.find(b"\r", 0, end) != -1:
+            data = data[:end].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            end = len(data)
+
+        pos = 0
+        line_no = state.line_no
+        for match in SCAN_RE.finditer(data, 0, end):
+            line_no += data.count(b"\n", pos, match.start()) + 1
+            pos = match.end()
+            line = match.group("line").decode("utf-8", errors="replace")
+            if line.startswith("NOTE: %INCLUDE"):
+                include_match = INCLUDE_RE.match(line)
+                if include_match:
+                    state.include_file = include_match.group("path")
+            elif line.startswith("MLOGIC("):
+                mlogic_match = MLOGIC_RE.match(line)
+                if mlogic_match:
+                    state.mlogic_context = mlogic_match.group("context")
+            else:
+                text = normalize_ws(line)
+                if text.startswith("ERROR:"):
+                    agg.add_error(log_path, line_no, state.include_file, state.mlogic_context, text)
+                else:
+                    agg.add_warning(text)
+
+        state.line_no += data.count(b"\n", 0, end)
+        state.offset += consumed
+
+    agg.total_lines = state.line_no
+
+
+def head_digest(path: Path, length: int) -> str:
+    with path.open("rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def index_path_for(log_path: Path, index_dir: Path) -> Path:
+    resolved = str(log_path.resolve())
+    tag = hashlib.sha1(resolved.encode("utf-8")).hexdigest()[:12]
+    return index_dir / f"{log_path.name}.{tag}.json"
+
+
+def analyze_file(log_path: str, index_dir: str, incremental: bool) -> Dict[str, object]:
+    """Parse one log (resuming from its index when incremental) and write its index. Runs in a worker."""
+    path = Path(log_path)
+    index_path = index_path_for(path, Path(index_dir))
+    size = path.stat().st_size
+    agg = LogAggregate()
+    state = ParseState()
+    resumed = False
+
+    if incremental and index_path.exists():
+        prior = json.loads(index_path.read_text(encoding="utf-8"))
+        prior_state = ParseState(**prior["state"])
+        if (
+            prior.get("version") == INDEX_VERSION
+            and prior_state.offset <= size
+            and head_digest(path, prior["head_len"]) == prior["head_sha1"]
+        ):
+            agg = LogAggregate.from_json(prior["aggregate"])
+            state = prior_state
+            resumed = True
+
+    start = state.offset
+    with path.open("rb") as f:
+        f.seek(state.offset)
+        parse_stream(f, agg, state, log_path, flush=not incremental)
+
+    head_len = min(HEAD_BYTES, state.offset)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(
+        json.dumps(
+            {
+                "version": INDEX_VERSION,
+                "log_path": log_path,
+                "size": size,
+                "head_len": head_len,
+                "head_sha1": head_digest(path, head_len),
+                "state": asdict(state),
+                "aggregate": agg.to_json(),
+            },
+            sort_keys=True,
+        ),
+        encoding="utf-8",
+    )
+    return {
+        "log_path": log_path,
+        "index": str(index_path),
+        "resumed": resumed,
+        "bytes_parsed": state.offset - start,
+        "aggregate": agg.to_json(),
+    }
 
 
-def summarize(messages: List[RuntimeMessage]) -> Dict[str, object]:
-    signature_counts = Counter(msg.text for msg in messages)
-    include_counts = Counter(msg.include_file for msg in messages)
-    category_counts = Counter(classify_error(msg.text) for msg in messages)
-    context_counts = Counter((msg.include_file, msg.mlogic_context, msg.text) for msg in messages)
-    first = first_occurrence(messages)
+def expand_inputs(specs: Sequence[str], pattern: str) -> List[Path]:
+    """Files named directly, matched by a glob, or found under a directory; duplicates dropped, order kept."""
+    found: List[Path] = []
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            found.extend(sorted(p for p in path.rglob(pattern) if p.is_file()))
+        elif glob.has_magic(spec):
+            found.extend(sorted(Path(p) for p in glob.glob(spec, recursive=True) if Path(p).is_file()))
+        elif path.exists():
+            found.append(path)
+        else:
+            raise SystemExit(f"log file not found: {path}")
+
+    seen = set()
+    unique: List[Path] = []
+    for path in found:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def analyze_logs(
+    log_paths: Sequence[Path], index_dir: Path, incremental: bool, jobs: int
+) -> Tuple[LogAggregate, List[Dict[str, object]]]:
+    """Parse every log (in a process pool when jobs > 1) and merge their counters in input order."""
+    args = [(str(p), str(index_dir), incremental) for p in log_paths]
+    if jobs > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(args))) as pool:
+            results = list(pool.map(analyze_file, *zip(*args)))
+    else:
+        results = [analyze_file(*a) for a in args]
 
-    return {
-        "signature_counts": dict(signature_counts),
-        "include_counts": dict(include_counts),
-        "category_counts": dict(category_counts),
-        "context_counts": {
-            " | ".join(k): v for k, v in context_counts.items()
-        },
-        "first_occurrence": first,
-    }
+    merged = LogAggregate()
+    for result in results:
+        merged.merge(LogAggregate.from_json(result["aggregate"]))  # type: ignore[arg-type]
+    return merged, results
 
 
-def assert_invariants(
-    errors: List[RuntimeMessage],
-    warnings: List[RuntimeMessage],
-    summary: Dict[str, object],
-) -> List[str]:
+def assert_invariants(agg: LogAggregate) -> List[str]:
     issues: List[str] = []
-    category_counts: Dict[str, int] = summary["category_counts"]  # type: ignore[assignment]
-    include_counts: Dict[str, int] = summary["include_counts"]  # type: ignore[assignment]
-    signature_counts: Dict[str, int] = summary["signature_counts"]  # type: ignore[assignment]
+    category_counts = agg.category_counts
+    include_counts = agg.include_counts
 
-    runtime_errors = len(errors)
-    runtime_warnings = len(warnings)
-    unique_signatures = len(signature_counts)
+    runtime_errors = agg.error_count
+    runtime_warnings = agg.warning_count
+    unique_signatures = len(agg.signature_counts)
 
     expected = {
         "runtime_errors": 1307,
@@ -207,27 +423,43 @@ def assert_invariants(
 
 
 def build_markdown_report(
-    log_path: Path,
-    errors: List[RuntimeMessage],
-    warnings: List[RuntimeMessage],
+    log_paths: Sequence[Path],
+    agg: LogAggregate,
     summary: Dict[str, object],
-    invariant_issues: List[str],
+    invariant_issues: Optional[List[str]],
+    file_results: Sequence[Dict[str, object]],
 ) -> str:
-    signature_counts: Dict[str, int] = summary["signature_counts"]  # type: ignore[assignment]
-    include_counts: Dict[str, int] = summary["include_counts"]  # type: ignore[assignment]
-    category_counts: Dict[str, int] = summary["category_counts"]  # type: ignore[assignment]
-    first: Dict[str, int] = summary["first_occurrence"]  # type: ignore[assignment]
+    signature_counts = agg.signature_counts
+    include_counts = agg.include_counts
+    category_counts = agg.category_counts
+    first: Dict[str, object] = summary["first_occurrence"]  # type: ignore[assignment]
 
     lines: List[str] = []
     lines.append("# Pass 1 Error Catalog and Root-Cause Classification")
     lines.append("")
-    lines.append(f"- Log file: `{log_path}`")
-    lines.append(f"- Total lines: `{sum(1 for _ in log_path.open('r', encoding='utf-8', errors='replace'))}`")
-    lines.append(f"- Runtime errors (`^ERROR:`): `{len(errors)}`")
-    lines.append(f"- Runtime warnings (`^WARNING:`): `{len(warnings)}`")
+    if len(log_paths) == 1:
+        lines.append(f"- Log file: `{log_paths[0]}`")
+    else:
+        lines.append(f"- Log files: `{len(log_paths)}`")
+    lines.append(f"- Total lines: `{agg.total_lines}`")
+    lines.append(f"- Runtime errors (`^ERROR:`): `{agg.error_count}`")
+    lines.append(f"- Runtime warnings (`^WARNING:`): `{agg.warning_count}`")
     lines.append(f"- Unique runtime error signatures: `{len(signature_counts)}`")
     lines.append("")
 
+    if len(log_paths) > 1:
+        lines.append("## Log Files")
+        lines.append("")
+        lines.append("| Log file | Lines | Errors | Warnings | Bytes parsed | Resumed |")
+        lines.append("|---|---:|---:|---:|---:|---|")
+        for result in file_results:
+            file_agg: Dict[str, int] = result["aggregate"]  # type: ignore[assignment]
+            lines.append(
+                f"| `{result['log_path']}` | {file_agg['total_lines']} | {file_agg['error_count']} | "
+                f"{file_agg['warning_count']} | {result['bytes_parsed']} | {'yes' if result['resumed'] else 'no'} |"
+            )
+        lines.append("")
+
     lines.append("## Include File Error Distribution")
     lines.append("")
     lines.append("| Include file | Error count |")
@@ -248,7 +480,9 @@ def build_markdown_report(
 
     lines.append("## Invariant Validation")
     lines.append("")
-    if not invariant_issues:
+    if invariant_issues is None:
+        lines.append("- Skipped: the Pass 1 invariants describe a single log.")
+    elif not invariant_issues:
         lines.append("- All invariants passed.")
     else:
         for issue in invariant_issues:
@@ -266,10 +500,9 @@ def build_markdown_report(
 
     lines.append("## Warning Signatures")
     lines.append("")
-    warning_counts = Counter(msg.text for msg in warnings)
     lines.append("| Count | Signature |")
     lines.append("|---:|---|")
-    for signature, count in sorted(warning_counts.items(), key=lambda kv: (-kv[1], kv[0])):
+    for signature, count in sorted(agg.warning_counts.items(), key=lambda kv: (-kv[1], kv[0])):
         lines.append(f"| {count} | `{signature}` |")
     lines.append("")
 
@@ -277,11 +510,33 @@ def build_markdown_report(
 
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument(
         "--log",
-        default="log-with-errors.txt",
-        help="Path to SAS log file (default: log-with-errors.txt)",
+        nargs="+",
+        default=["log-with-errors.txt"],
+        help="SAS log files, globs, or directories (default: log-with-errors.txt)",
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.log",
+        help="File pattern used when --log names a directory (default: *.log)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for parsing files in parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Resume each log from its index and parse only bytes appended since the last run",
+    )
+    parser.add_argument(
+        "--index-dir",
+        default="reports/log-index",
+        help="Directory for the per-file JSON indexes (default: reports/log-index)",
     )
     parser.add_argument(
         "--out-md",
@@ -300,17 +555,16 @@ def main() -> int:
     )
     args = parser.parse_args()
 
-    log_path = Path(args.log)
-    if not log_path.exists():
-        raise SystemExit(f"log file not found: {log_path}")
-
-    with log_path.open("r", encoding="utf-8", errors="replace") as f:
-        errors, warnings = parse_runtime_messages(f)
+    log_paths = expand_inputs(args.log, args.pattern)
+    if not log_paths:
+        raise SystemExit(f"no log files matched: {' '.join(args.log)}")
 
-    summary = summarize(errors)
-    invariant_issues = assert_invariants(errors, warnings, summary)
+    agg, file_results = analyze_logs(log_paths, Path(args.index_dir), args.incremental, max(args.jobs, 1))
+    single = len(log_paths) == 1
+    summary = agg.summary(single_log=single)
+    invariant_issues = assert_invariants(agg) if single else None
 
-    md = build_markdown_report(log_path, errors, warnings, summary, invariant_issues)
+    md = build_markdown_report(log_paths, agg, summary, invariant_issues, file_results)
 
     out_md = Path(args.out_md)
     out_json = Path(args.out_json)
@@ -321,11 +575,14 @@ def main() -> int:
     out_json.write_text(
         json.dumps(
             {
-                "log_path": str(log_path),
-                "runtime_error_count": len(errors),
-                "runtime_warning_count": len(warnings),
+                "log_path": str(log_paths[0]) if single else [str(p) for p in log_paths],
+                "runtime_error_count": agg.error_count,
+                "runtime_warning_count": agg.warning_count,
                 "summary": summary,
-                "invariant_issues": invariant_issues,
+                "invariant_issues": invariant_issues or [],
+                "files": [
+                    {k: v for k, v in result.items() if k != "aggregate"} for result in file_results
+                ],
             },
             indent=2,
             sort_keys=True,
@@ -335,7 +592,10 @@ def main() -> int:
 
     print(f"Wrote report: {out_md}")
     print(f"Wrote summary: {out_json}")
-    if invariant_issues:
+    print(f"Per-file indexes: {args.index_dir} ({len(file_results)} file(s))")
+    if invariant_issues is None:
+        print("Invariants skipped for a multi-file report.")
+    elif invariant_issues:
         print("Invariant issues:")
         for issue in invariant_issues:
             print(f"- {issue}")
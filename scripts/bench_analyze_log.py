@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Benchmark analyze_log_with_errors.py on synthetic SAS logs.
+
+Generates --files logs of about --size-mb each under --dir (a temporary
+directory by default) from a fixed mix of MPRINT/MLOGIC/NOTE lines, %INCLUDE
+banners, runtime ERROR/WARNING lines and echoed source that merely contains
+"ERROR:". Then times three runs over the same logs:
+
+- full parse with --jobs 1
+- full parse with --jobs N (process pool)
+- incremental rerun after appending --append-kb to every log
+
+and prints wall seconds, MB/s and the peak RSS of the worker processes, so the
+effect of parallelism and of incremental resume can be measured on multi-GB
+inputs without a real SAS session.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+
+ANALYZER = Path(__file__).with_name("analyze_log_with_errors.py")
+
+INCLUDES = (
+    "/parm_share/small_business/modeling/sassyverse/src/pipr/predicates.sas",
+    "/parm_share/small_business/modeling/sassyverse/src/pipr/pipr.sas",
+    "/parm_share/small_business/modeling/sassyverse/src/strings.sas",
+)
+NOISE = (
+    "MPRINT(PIPE):   data work._pipr_tmp1;",
+    "MPRINT(PIPE):   set work.input(where=(amt > 10));",
+    "MLOGIC(_PRED_EXPAND_EXPR):  Beginning execution.",
+    "MLOGIC(_STEP_PARSE):  %LET (variable name is _VERB)",
+    "NOTE: The data set WORK._PIPR_TMP1 has 100 observations and 4 variables.",
+    "NOTE: DATA statement used (Total process time):",
+    "      real time           0.01 seconds",
+    "SYMBOLGEN:  Macro variable STEPS resolves to filter(x > 1) | select(a b)",
+    "12         %put ERROR: this is echoed source, not a runtime error;",
+)
+ERRORS = (
+    "ERROR: Maximum level of nesting of macro functions exceeded.",
+    "ERROR: Expected %DO not found.",
+    "ERROR: The macro _PRED_RESOLVE_GEN_ARGS will stop executing.",
+    "ERROR: Expecting a variable name after %LET.",
+)
+WARNINGS = (
+    "WARNING: Apparent symbolic reference X not resolved.",
+    "WARNING: Data set WORK.NOPE was not found.",
+)
+
+
+def synth_lines(rng: random.Random, target_bytes: int) -> List[str]:
+    """One chunk of log text; roughly one line in 200 is a runtime error or warning."""
+    lines: List[str] = []
+    size = 0
+    while size < target_bytes:
+        roll = rng.random()
+        if roll < 0.002:
+            line = f"NOTE: %INCLUDE (level 1) file {rng.choice(INCLUDES)} is file {rng.choice(INCLUDES)}."
+        elif roll < 0.004:
+            line = rng.choice(ERRORS)
+        elif roll < 0.005:
+            line = rng.choice(WARNINGS)
+        else:
+            line = rng.choice(NOISE)
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+
+def write_log(path: Path, size_bytes: int, seed: int, mode: str = "w") -> None:
+    rng = random.Random(seed)
+    chunk = 1 << 20
+    written = 0
+    with path.open(mode, encoding="utf-8", newline="\n") as f:
+        while written < size_bytes:
+            text = "\n".join(synth_lines(rng, min(chunk, size_bytes - written))) + "\n"
+            f.write(text)
+            written += len(text)
+
+
+def run_analyzer(logs_dir: Path, out_dir: Path, jobs: int, incremental: bool) -> float:
+    cmd = [
+        sys.executable,
+        str(ANALYZER),
+        "--log",
+        str(logs_dir),
+        "--jobs",
+        str(jobs),
+        "--index-dir",
+        str(out_dir / "index"),
+        "--out-md",
+        str(out_dir / "report.md"),
+        "--out-json",
+        str(out_dir / "report.json"),
+    ]
+    if incremental:
+        cmd.append("--incremental")
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def peak_child_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8, help="Number of synthetic logs (default: 8)")
+    parser.add_argument("--size-mb", type=float, default=256.0, help="Approximate size of each log in MB (default: 256)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Workers for the parallel run (default: CPU count)")
+    parser.add_argument("--append-kb", type=int, default=512, help="KB appended to each log before the incremental run")
+    parser.add_argument("--dir", default=None, help="Directory for logs and outputs (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep generated logs and outputs")
+    args = parser.parse_args()
+
+    root = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix="sas-log-bench-"))
+    logs_dir = root / "logs"
+    out_dir = root / "out"
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        size_bytes = int(args.size_mb * 1024 * 1024)
+        for i in range(args.files):
+            write_log(logs_dir / f"run{i:03d}.log", size_bytes, seed=i)
+        total_mb = sum(p.stat().st_size for p in logs_dir.glob("*.log")) / (1024 * 1024)
+        print(f"Generated {args.files} log(s), {total_mb:.1f} MB total, in {logs_dir}")
+
+        serial = run_analyzer(logs_dir, out_dir, jobs=1, incremental=False)
+        print(f"full, jobs=1:        {serial:8.2f} s  {total_mb / serial:8.1f} MB/s")
+
+        parallel = run_analyzer(logs_dir, out_dir, jobs=args.jobs, incremental=False)
+        print(f"full, jobs={args.jobs:<3}      {parallel:8.2f} s  {total_mb / parallel:8.1f} MB/s"
+              f"  ({serial / parallel:.2f}x)")
+
+        for i in range(args.files):
+            write_log(logs_dir / f"run{i:03d}.log", args.append_kb * 1024, seed=1000 + i, mode="a")
+        incremental = run_analyzer(logs_dir, out_dir, jobs=args.jobs, incremental=True)
+        print(f"incremental (+{args.append_kb} KB/log): {incremental:8.2f} s")
+
+        print(f"peak worker RSS:     {peak_child_rss_mb():8.1f} MB")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -40,7 +40,7 @@ def main() -> int:
     entry = read_text(repo / "sassyverse.sas")
 
     include_blocks = re.findall(
-        r"%_sassyverse_include_list\(\s*root=%superq\(root\),\s*files=%str\((.*?)\),\s*out_failed=_sv_failed",
+        r"%macro\s+_sassyverse_(?:core|pipr)_files\s*;(.*?)%mend",
         entry,
         re.S,
     )
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Compare two pipr benchmark result files and flag regressions.
+
+Input files are CSV exports of the results dataset written by
+tests/run_benchmarks.sas (%pipr_bench(..., csv=...)). Rows are grouped by
+scenario and data shape (n_rows, n_keys, str_width, skew); each group is
+reduced to the median of its reps so one noisy rep does not flag a regression.
+
+A scenario regresses when the candidate median exceeds the baseline median by
+more than --threshold (relative) and by more than --min-delta (absolute, in the
+metric's own unit) so sub-second noise on tiny scenarios is ignored.
+
+Exit status: 0 when no regressions, 1 when any scenario regressed, 2 on
+input errors (or, with --strict, when scenarios are missing from either file).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import statistics
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+KEY_COLUMNS = ("scenario", "n_rows", "n_keys", "str_width", "skew")
+DEFAULT_METRICS = ("wall_sec", "cpu_sec", "mem_hwm_delta_kb")
+DEFAULT_MIN_DELTA = {"wall_sec": 0.05, "cpu_sec": 0.05, "mem_hwm_delta_kb": 1024.0}
+
+GroupKey = Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Comparison:
+    key: GroupKey
+    metric: str
+    baseline: float
+    candidate: float
+
+    @property
+    def delta(self) -> float:
+        return self.candidate - self.baseline
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if self.baseline == 0:
+            return None
+        return self.candidate / self.baseline
+
+
+def parse_number(text: str) -> Optional[float]:
+    text = (text or "").strip()
+    if text in ("", "."):
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def normalize_key_value(column: str, text: str) -> str:
+    if column == "scenario":
+        return (text or "").strip().upper()
+    value = parse_number(text)
+    return "" if value is None else f"{value:g}"
+
+
+def load_results(path: Path, metrics: Tuple[str, ...]) -> Dict[GroupKey, Dict[str, float]]:
+    """Return {group key: {metric: median over reps}} for one results CSV; ValueError if key columns are missing."""
+    samples: Dict[GroupKey, Dict[str, List[float]]] = {}
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+        missing = [c for c in KEY_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"{path}: missing column(s): {', '.join(missing)}")
+        for row in reader:
+            key = tuple(normalize_key_value(c, row[columns[c]]) for c in KEY_COLUMNS)
+            bucket = samples.setdefault(key, {m: [] for m in metrics})
+            for metric in metrics:
+                if metric not in columns:
+                    continue
+                value = parse_number(row[columns[metric]])
+                if value is not None:
+                    bucket[metric].append(value)
+
+    return {
+        key: {metric: statistics.median(values) for metric, values in by_metric.items() if values}
+        for key, by_metric in samples.items()
+    }
+
+
+def compare(
+    baseline: Dict[GroupKey, Dict[str, float]],
+    candidate: Dict[GroupKey, Dict[str, float]],
+    metrics: Tuple[str, ...],
+) -> List[Comparison]:
+    out: List[Comparison] = []
+    for key in sorted(set(baseline) & set(candidate)):
+        for metric in metrics:
+            if metric in baseline[key] and metric in candidate[key]:
+                out.append(Comparison(key, metric, baseline[key][metric], candidate[key][metric]))
+    return out
+
+
+def is_regression(item: Comparison, threshold: float, min_delta: float) -> bool:
+    if item.delta <= min_delta:
+        return False
+    if item.baseline <= 0:
+        return True
+    return item.delta / item.baseline > threshold
+
+
+def format_key(key: GroupKey) -> str:
+    scenario, n_rows, n_keys, str_width, skew = key
+    return f"{scenario} (n={n_rows} keys={n_keys} width={str_width} skew={skew})"
+
+
+def format_row(item: Comparison, flag: str) -> str:
+    ratio = "n/a" if item.ratio is None else f"{item.ratio:.2f}x"
+    return (
+        f"{flag:<4} {format_key(item.key):<64} {item.metric:<17} "
+        f"{item.baseline:>12.4f} {item.candidate:>12.4f} {ratio:>8}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two pipr benchmark result CSV files.")
+    parser.add_argument("baseline", help="Results CSV from the reference run")
+    parser.add_argument("candidate", help="Results CSV from the run being checked")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown that counts as a regression (default: 0.10 = 10%%)",
+    )
+    parser.add_argument(
+        "--metric",
+        action="append",
+        dest="metrics",
+        help=f"Metric column to compare; repeatable (default: {', '.join(DEFAULT_METRICS)})",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=None,
+        help="Absolute increase below which differences are ignored (default: per-metric noise floor)",
+    )
+    parser.add_argument("--all", action="store_true", help="Print every comparison, not only regressions")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit 2 when a scenario is present in only one of the files",
+    )
+    args = parser.parse_args()
+
+    metrics = tuple(m.strip().lower() for m in (args.metrics or DEFAULT_METRICS))
+    paths = [Path(args.baseline), Path(args.candidate)]
+    for path in paths:
+        if not path.exists():
+            print(f"results file not found: {path}", file=sys.stderr)
+            return 2
+
+    try:
+        baseline = load_results(paths[0], metrics)
+        candidate = load_results(paths[1], metrics)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    results = compare(baseline, candidate, metrics)
+
+    regressions = []
+    for item in results:
+        min_delta = args.min_delta if args.min_delta is not None else DEFAULT_MIN_DELTA.get(item.metric, 0.0)
+        flagged = is_regression(item, args.threshold, min_delta)
+        if flagged:
+            regressions.append(item)
+        if flagged or args.all:
+            print(format_row(item, "REG" if flagged else "ok"))
+
+    only_baseline = sorted(set(baseline) - set(candidate))
+    only_candidate = sorted(set(candidate) - set(baseline))
+    for key in only_baseline:
+        print(f"missing from candidate: {format_key(key)}")
+    for key in only_candidate:
+        print(f"new in candidate: {format_key(key)}")
+
+    print(
+        f"Compared {len(results)} metric(s) across {len(set(baseline) & set(candidate))} scenario(s); "
+        f"{len(regressions)} regression(s) above {args.threshold:.0%}."
+    )
+    if regressions:
+        return 1
+    if args.strict and (only_baseline or only_candidate):
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
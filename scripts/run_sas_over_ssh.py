@@ -1,13 +1,45 @@
 #!/usr/bin/env python3
-"""Upload and run a SAS script over SSH, capturing stdout/stderr and a SAS log."""
+"""Upload and run SAS scripts over SSH, capturing stdout/stderr and SAS logs.
+
+Single mode (--local-script) runs one script and downloads its log as
+--log-name, as before. Batch mode (--scripts) runs many scripts with at most
+--jobs running at once:
+
+- one SSH connection is opened and every job runs on its own channel of it,
+  plus a single SFTP session shared by uploads and log reads;
+- an upload is skipped when the remote copy's recorded SHA-256 (a sidecar
+  <script>.sha256 next to it) matches the local file;
+- each job's log is polled while it runs and appended to the local copy, so
+  download-dir/<script stem>.log can be tailed during the run.
+
+--backend local runs the same scheduler with subprocesses on this machine
+(--remote-dir is then a local work directory), so batches can be exercised
+without a remote host.
+
+With --backend ssh, keep --jobs below the server's sshd MaxSessions (10 by
+default; the SFTP session uses one).
+"""
 
 import argparse
-import getpass
+import glob
+from abc import ABC, abstractmethod
+import hashlib
 import os
 import posixpath
+import shlex
+import shutil
+import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
-import paramiko
+try:
+    import paramiko
+except ImportError:  # only the ssh backend needs it
+    paramiko = None
 
 
 def read_password(path: str) -> str:
@@ -17,20 +49,44 @@ def read_password(path: str) -> str:
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Upload a SAS script to a remote host and execute it."
+        description="Upload SAS scripts to a remote host and execute them.",
+        epilog=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
     )
-    parser.add_argument("--host", required=True, help="SSH host, e.g., lnxvsashq001")
-    parser.add_argument("--user", required=True, help="SSH username")
+    parser.add_argument(
+        "--backend",
+        choices=("ssh", "local"),
+        default="ssh",
+        help="Run over SSH (default) or as local subprocesses",
+    )
+    parser.add_argument("--host", help="SSH host, e.g., lnxvsashq001 (ssh backend)")
+    parser.add_argument("--user", help="SSH username (ssh backend)")
     parser.add_argument(
         "--password-file",
-        required=True,
         default=".pw",
-        help="Path to a file containing the SSH password",
+        help="Path to a file containing the SSH password (default: .pw)",
     )
     parser.add_argument(
         "--local-script",
         default="testing.sas",
-        help="Local SAS script to upload (default: testing.sas)",
+        help="Local SAS script to upload in single mode (default: testing.sas)",
+    )
+    parser.add_argument(
+        "--scripts",
+        nargs="+",
+        help="Batch mode: SAS scripts or globs to run; logs are named after each script",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Batch mode: scripts running at once (default: 4)",
+    )
+    parser.add_argument(
+        "--poll-secs",
+        type=float,
+        default=2.0,
+        help="Seconds between log polls while jobs run (default: 2)",
     )
     parser.add_argument(
         "--remote-dir",
@@ -45,89 +101,331 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--log-name",
         default="run_tests.log",
-        help="SAS log filename to write on the remote host",
+        help="SAS log filename to write on the remote host (single mode)",
     )
     parser.add_argument(
         "--download-dir",
         default=".",
-        help="Local directory for downloaded log (default: current dir)",
+        help="Local directory for downloaded logs (default: current dir)",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.backend == "ssh" and not (args.host and args.user):
+        parser.error("--host and --user are required with --backend ssh")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
 
 
-def ensure_remote_dir(sftp: paramiko.SFTPClient, remote_dir: str) -> None:
-    try:
-        sftp.listdir(remote_dir)
-    except IOError:
-        sftp.mkdir(remote_dir)
-
-
-def run_remote_sas(
-    ssh: paramiko.SSHClient,
-    sas_cmd: str,
-    remote_script: str,
-    remote_log: str,
-) -> int:
-    cmd = (
-        f"{sas_cmd} -sysin {remote_script} "
-        f"-log {remote_log} -print {remote_log}.lst"
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sas_command(sas_cmd: str, script: str, log: str) -> List[str]:
+    return shlex.split(sas_cmd) + ["-sysin", script, "-log", log, "-print", f"{log}.lst"]
+
+
+@dataclass
+class Job:
+    local_script: str
+    remote_script: str
+    remote_log: str
+    local_log: str
+    exit_code: Optional[int] = None
+    stdout: str = ""
+    stderr: str = ""
+    uploaded: bool = False
+    seconds: float = 0.0
+    log_offset: int = 0
+    started: bool = False
+
+
+class Backend(ABC):
+    """Where scripts run. Subclasses provide file access and command execution; uploads are shared."""
+
+    @abstractmethod
+    def read_text(self, path: str) -> Optional[str]:
+        """Stripped text of path, or None when it cannot be read."""
+
+    @abstractmethod
+    def write_text(self, path: str, text: str) -> None:
+        """Replace path with text."""
+
+    @abstractmethod
+    def put(self, local_path: str, path: str) -> None:
+        """Copy the local file local_path to path."""
+
+    @abstractmethod
+    def read_from(self, path: str, offset: int) -> bytes:
+        """Bytes of path from offset to its current end; empty when the file does not exist yet."""
+
+    @abstractmethod
+    def remove(self, path: str) -> None:
+        """Delete path if it exists."""
+
+    @abstractmethod
+    def ensure_dir(self, path: str) -> None:
+        """Create the directory path unless it exists."""
+
+    @abstractmethod
+    def execute(self, argv: List[str]) -> Tuple[int, str, str]:
+        """Run argv to completion; returns (exit code, stdout, stderr)."""
+
+    def close(self) -> None:
+        pass
+
+    def upload(self, local_script: str, remote_script: str) -> bool:
+        """Copy the script unless the copy there has the same hash; returns whether it was copied."""
+        local_hash = file_sha256(local_script)
+        if self.read_text(f"{remote_script}.sha256") == local_hash:
+            return False
+        self.put(local_script, remote_script)
+        self.write_text(f"{remote_script}.sha256", local_hash)
+        return True
+
+
+class SSHBackend(Backend):
+    """One SSH connection: each execute() opens a channel on it; file access goes through one SFTP session."""
+
+    def __init__(self, host: str, user: str, password: str) -> None:
+        if paramiko is None:
+            raise SystemExit("the ssh backend needs paramiko: pip install paramiko")
+        self.ssh = paramiko.SSHClient()
+        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.ssh.connect(host, username=user, password=password)
+        self.sftp = self.ssh.open_sftp()
+        self._sftp_lock = threading.Lock()
+
+    def read_text(self, path: str) -> Optional[str]:
+        with self._sftp_lock:
+            try:
+                with self.sftp.open(path, "r") as handle:
+                    return handle.read().decode("utf-8").strip()
+            except IOError:
+                return None
+
+    def write_text(self, path: str, text: str) -> None:
+        with self._sftp_lock:
+            with self.sftp.open(path, "w") as handle:
+                handle.write(text)
+
+    def put(self, local_path: str, path: str) -> None:
+        with self._sftp_lock:
+            self.sftp.put(local_path, path)
+
+    def read_from(self, path: str, offset: int) -> bytes:
+        with self._sftp_lock:
+            try:
+                with self.sftp.open(path, "rb") as handle:
+                    handle.seek(offset)
+                    return handle.read()
+            except IOError:
+                return b""
+
+    def remove(self, path: str) -> None:
+        with self._sftp_lock:
+            try:
+                self.sftp.remove(path)
+            except IOError:
+                pass
+
+    def ensure_dir(self, path: str) -> None:
+        with self._sftp_lock:
+            try:
+                self.sftp.listdir(path)
+            except IOError:
+                self.sftp.mkdir(path)
+
+    def execute(self, argv: List[str]) -> Tuple[int, str, str]:
+        stdin, stdout, stderr = self.ssh.exec_command(" ".join(shlex.quote(a) for a in argv))
+        stdin.close()
+        # Drain stderr on its own thread: reading stdout to EOF first would stall once the
+        # remote side blocks on a full stderr window.
+        stderr_chunks: List[bytes] = []
+        drain = threading.Thread(target=lambda: stderr_chunks.append(stderr.read()), daemon=True)
+        drain.start()
+        stdout_data = stdout.read().decode("utf-8", errors="replace")
+        drain.join()
+        stderr_data = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+        return stdout.channel.recv_exit_status(), stdout_data, stderr_data
+
+    def close(self) -> None:
+        self.sftp.close()
+        self.ssh.close()
+
+
+class LocalBackend(Backend):
+    """Runs the SAS command as a local subprocess; paths are local paths."""
+
+    def read_text(self, path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                return handle.read().strip()
+        except OSError:
+            return None
+
+    def write_text(self, path: str, text: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+
+    def put(self, local_path: str, path: str) -> None:
+        shutil.copyfile(local_path, path)
+
+    def read_from(self, path: str, offset: int) -> bytes:
+        try:
+            with open(path, "rb") as handle:
+                handle.seek(offset)
+                return handle.read()
+        except OSError:
+            return b""
+
+    def remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def ensure_dir(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+
+    def execute(self, argv: List[str]) -> Tuple[int, str, str]:
+        proc = subprocess.run(argv, capture_output=True)
+        return (
+            proc.returncode,
+            proc.stdout.decode("utf-8", errors="replace"),
+            proc.stderr.decode("utf-8", errors="replace"),
+        )
+
+
+def stream_log(backend: Backend, job: Job) -> None:
+    """Append whatever the job's log gained since the last poll to its local copy."""
+    data = backend.read_from(job.remote_log, job.log_offset)
+    if data:
+        with open(job.local_log, "ab") as handle:
+            handle.write(data)
+        job.log_offset += len(data)
+
+
+def run_job(backend: Backend, sas_cmd: str, job: Job) -> Job:
+    start = time.monotonic()
+    job.uploaded = backend.upload(job.local_script, job.remote_script)
+    # A log left by an earlier run must not be streamed as this run's.
+    backend.remove(job.remote_log)
+    job.started = True
+    job.exit_code, job.stdout, job.stderr = backend.execute(
+        sas_command(sas_cmd, job.remote_script, job.remote_log)
     )
-    stdin, stdout, stderr = ssh.exec_command(cmd)
-    stdin.close()
-    stdout_data = stdout.read().decode("utf-8", errors="replace")
-    stderr_data = stderr.read().decode("utf-8", errors="replace")
+    job.seconds = time.monotonic() - start
+    return job
+
+
+def run_batch(backend: Backend, sas_cmd: str, jobs: List[Job], max_jobs: int, poll_secs: float) -> None:
+    """Run jobs with at most max_jobs at once, streaming every running job's log until all finish."""
+    for job in jobs:
+        os.makedirs(os.path.dirname(job.local_log), exist_ok=True)
+        open(job.local_log, "wb").close()
 
-    if stdout_data:
-        print("=== STDOUT ===")
-        print(stdout_data)
-    if stderr_data:
-        print("=== STDERR ===")
-        print(stderr_data)
+    with ThreadPoolExecutor(max_workers=max_jobs) as pool:
+        futures = {pool.submit(run_job, backend, sas_cmd, job): job for job in jobs}
+        pending = dict(futures)
+        while pending:
+            time.sleep(poll_secs)
+            for future, job in list(pending.items()):
+                done = future.done()
+                if job.started:
+                    stream_log(backend, job)
+                if done:
+                    future.result()
+                    del pending[future]
+                    print(f"[{job.exit_code}] {os.path.basename(job.local_script)} ({job.seconds:.1f}s)")
 
-    return stdout.channel.recv_exit_status()
+
+def expand_scripts(specs: List[str]) -> List[str]:
+    scripts: List[str] = []
+    for spec in specs:
+        matches = sorted(glob.glob(spec)) if glob.has_magic(spec) else [spec]
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in scripts:
+                scripts.append(path)
+    return scripts
 
 
 def main() -> int:
     args = parse_args()
-    password = read_password(args.password_file)
 
-    local_script = os.path.abspath(args.local_script)
-    if not os.path.exists(local_script):
-        print(f"Local script not found: {local_script}", file=sys.stderr)
+    if args.scripts:
+        scripts = expand_scripts(args.scripts)
+    else:
+        scripts = [os.path.abspath(args.local_script)]
+
+    missing = [s for s in scripts if not os.path.exists(s)]
+    if missing or not scripts:
+        for path in missing or args.scripts:
+            print(f"Local script not found: {path}", file=sys.stderr)
         return 2
 
-    remote_dir = args.remote_dir.rstrip("/")
-    remote_script = posixpath.join(remote_dir, os.path.basename(local_script))
-    remote_log = posixpath.join(remote_dir, args.log_name)
+    names: Dict[str, str] = {}
+    for path in scripts:
+        name = os.path.basename(path)
+        if name in names:
+            print(f"Two scripts share the name {name}: {names[name]}, {path}", file=sys.stderr)
+            return 2
+        names[name] = path
 
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(args.host, username=args.user, password=password)
+    if args.backend == "ssh":
+        backend: Backend = SSHBackend(args.host, args.user, read_password(args.password_file))
+        remote_dir = args.remote_dir.rstrip("/")
+        join = posixpath.join
+    else:
+        backend = LocalBackend()
+        remote_dir = os.path.abspath(args.remote_dir)
+        join = os.path.join
+    download_dir = os.path.abspath(args.download_dir)
 
-    try:
-        sftp = ssh.open_sftp()
-        try:
-            ensure_remote_dir(sftp, remote_dir)
-            sftp.put(local_script, remote_script)
-        finally:
-            sftp.close()
+    jobs: List[Job] = []
+    for path in scripts:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        log_name = args.log_name if not args.scripts else f"{stem}.log"
+        jobs.append(
+            Job(
+                local_script=path,
+                remote_script=join(remote_dir, os.path.basename(path)),
+                remote_log=join(remote_dir, log_name),
+                local_log=os.path.join(download_dir, log_name),
+            )
+        )
 
-        exit_code = run_remote_sas(ssh, args.sas_cmd, remote_script, remote_log)
+    try:
+        backend.ensure_dir(remote_dir)
+        run_batch(backend, args.sas_cmd, jobs, args.jobs, args.poll_secs)
+    finally:
+        backend.close()
 
-        download_dir = os.path.abspath(args.download_dir)
-        os.makedirs(download_dir, exist_ok=True)
-        local_log = os.path.join(download_dir, args.log_name)
+    for job in jobs:
+        label = os.path.basename(job.local_script)
+        if job.stdout:
+            print(f"=== STDOUT ({label}) ===")
+            print(job.stdout)
+        if job.stderr:
+            print(f"=== STDERR ({label}) ===")
+            print(job.stderr)
 
-        sftp = ssh.open_sftp()
-        try:
-            sftp.get(remote_log, local_log)
-        finally:
-            sftp.close()
+    if not args.scripts:
+        print(f"Downloaded log to: {jobs[0].local_log}")
+        return jobs[0].exit_code or 0
 
-        print(f"Downloaded log to: {local_log}")
-        return exit_code
-    finally:
-        ssh.close()
+    print(f"{'exit':>4}  {'secs':>7}  upload  script -> log")
+    for job in jobs:
+        print(
+            f"{job.exit_code:>4}  {job.seconds:>7.1f}  {'yes' if job.uploaded else 'skip':<6}  "
+            f"{os.path.basename(job.local_script)} -> {job.local_log}"
+        )
+    failed = [job for job in jobs if job.exit_code]
+    return max((job.exit_code or 0) for job in failed) if failed else 0
 
 
 if __name__ == "__main__":